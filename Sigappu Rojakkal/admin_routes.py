@@ -1,15 +1,21 @@
-from flask import Blueprint, render_template, session, redirect, url_for, request, jsonify
-from db import get_db_connection
+from flask import Blueprint, render_template, session, redirect, url_for, request, jsonify, Response
+from db import get_db_connection, get_read_connection, replica_status
 import pandas as pd
 import os
 import random
 
 # Import the necessary AI agent functions
-from ai_agents import hr_agent_bulk_onboard, generate_employee_analysis_agent, profile_agent_get_vectors
+from ai_agents import (hr_agent_bulk_onboard, generate_employee_analysis_agent, profile_agent_get_vectors, get_parse_stats,
+                       agenerate_employee_analysis_agent, aprofile_agent_get_vectors, astream_employee_analysis)
+from async_views import async_variant
+from artifact_cache import invalidate_employee_artifacts
 
 # This creates the 'admin' blueprint.
 admin_bp = Blueprint('admin', __name__)
 
+# Maximum number of employees touched by a single bulk-operation transaction.
+BULK_BATCH_SIZE = 500
+
 # --- Page Rendering Routes ---
 
 @admin_bp.route('/dashboard')
@@ -35,16 +41,7 @@ def agent_metrics_page():
         return redirect('/')
     return render_template('admin_agent_metrics.html')
 
-@admin_bp.route('/ai_report/<int:emp_id>')
-def ai_report_page(emp_id):
-    """
-    Generates and displays the AI-powered skill analysis report for a single employee.
-    """
-    if session.get('role') != 'admin':
-        return redirect('/')
-    
-    employee_details, top_skills, weak_skills, analysis_text = generate_employee_analysis_agent(emp_id)
-    
+def _render_ai_report(employee_details, top_skills, weak_skills, analysis_text):
     if not employee_details:
         return "Employee not found", 404
         
@@ -54,6 +51,44 @@ def ai_report_page(emp_id):
                            weak_skills=weak_skills, 
                            analysis=analysis_text)
 
+@admin_bp.route('/ai_report/<int:emp_id>')
+def ai_report_page(emp_id):
+    """
+    Generates and displays the AI-powered skill analysis report for a single employee.
+    """
+    if session.get('role') != 'admin':
+        return redirect('/')
+    return _render_ai_report(*generate_employee_analysis_agent(emp_id))
+
+@async_variant(ai_report_page)
+async def ai_report_page_async(emp_id):
+    if session.get('role') != 'admin':
+        return redirect('/')
+    return _render_ai_report(*await agenerate_employee_analysis_agent(emp_id))
+
+@admin_bp.route('/api/ai_report/<int:emp_id>/stream')
+def stream_ai_report(emp_id):
+    """
+    API endpoint returning the raw analysis text of the AI report.
+    Under WSGI the full text is returned at once; see the async variant for streaming.
+    """
+    if session.get('role') != 'admin':
+        return jsonify({"success": False, "message": "Unauthorized"}), 401
+    employee_details, _, _, analysis_text = generate_employee_analysis_agent(emp_id)
+    if not employee_details:
+        return jsonify({"success": False, "message": analysis_text}), 404
+    return Response(analysis_text, mimetype='text/plain')
+
+@async_variant(stream_ai_report)
+async def stream_ai_report_async(emp_id):
+    """Streams the analysis text chunk by chunk as the model produces it (asgi.py only)."""
+    if session.get('role') != 'admin':
+        return jsonify({"success": False, "message": "Unauthorized"}), 401
+    chunks = await astream_employee_analysis(emp_id)
+    if chunks is None:
+        return jsonify({"success": False, "message": "Employee not found."}), 404
+    return Response(chunks, mimetype='text/plain')
+
 # --- API Endpoints for Admin Functionality ---
 
 @admin_bp.route('/stats')
@@ -64,7 +99,7 @@ def get_dashboard_stats():
     if session.get('role') != 'admin':
         return jsonify({"success": False, "message": "Unauthorized"}), 401
 
-    conn = get_db_connection()
+    conn = get_read_connection()
     stats = {
         "total_employees": 0,
         "learning_progress_chart": {"labels": [], "data": []},
@@ -117,22 +152,44 @@ def get_agent_metrics():
         "Assessment_Agent": {"queue": random.randint(0, 3), "latency_ms": random.randint(300, 700), "error_rate": f"{random.uniform(0.2, 1.8):.2f}%"},
         "Tracker_Agent": {"queue": random.randint(0, 2), "latency_ms": random.randint(500, 1200), "error_rate": f"{random.uniform(1.0, 3.0):.2f}%"}
     }
-    return jsonify({"success": True, "metrics": metrics})
+    # Real JSON parse-failure rates recorded by the structured-output agents.
+    # These are per worker process; under a multi-worker server each call sees one worker's counts.
+    parse_stats = get_parse_stats()
+    for agent, stats in parse_stats.items():
+        if agent in metrics:
+            metrics[agent]["parse_failure_rate"] = stats["failure_rate"]
+    return jsonify({"success": True, "metrics": metrics, "parse_stats": parse_stats, "parse_stats_pid": os.getpid()})
 
-@admin_bp.route('/api/profile_agent/<int:emp_id>')
-def run_profile_agent(emp_id):
+@admin_bp.route('/api/db_status')
+def get_db_status():
     """
-    API endpoint to run the new Profile Agent for a specific employee.
+    API endpoint reporting the measured lag of each read replica.
     """
     if session.get('role') != 'admin':
         return jsonify({"success": False, "message": "Unauthorized"}), 401
-    
-    result = profile_agent_get_vectors(emp_id)
+    return jsonify({"success": True, "replicas": replica_status()})
+
+def _profile_agent_response(result):
     if "error" in result:
         return jsonify({"success": False, "message": result.get("raw_response", result["error"])}), 500
         
     return jsonify({"success": True, "data": result})
 
+@admin_bp.route('/api/profile_agent/<int:emp_id>')
+def run_profile_agent(emp_id):
+    """
+    API endpoint to run the new Profile Agent for a specific employee.
+    """
+    if session.get('role') != 'admin':
+        return jsonify({"success": False, "message": "Unauthorized"}), 401
+    return _profile_agent_response(profile_agent_get_vectors(emp_id))
+
+@async_variant(run_profile_agent)
+async def run_profile_agent_async(emp_id):
+    if session.get('role') != 'admin':
+        return jsonify({"success": False, "message": "Unauthorized"}), 401
+    return _profile_agent_response(await aprofile_agent_get_vectors(emp_id))
+
 
 @admin_bp.route('/employees', methods=['GET'])
 def list_employees():
@@ -142,7 +199,7 @@ def list_employees():
     if session.get('role') != 'admin':
         return jsonify({"success": False, "message": "Unauthorized"}), 401
     
-    conn = get_db_connection()
+    conn = get_read_connection()
     try:
         with conn.cursor() as cursor:
             sql = "SELECT e.id, e.name, tr.role_name FROM employees e LEFT JOIN tsr_roles tr ON e.tsr_role_id = tr.role_id ORDER BY e.id"
@@ -167,7 +224,7 @@ def add_employee():
     try:
         with conn.cursor() as cursor:
             sql_employee = "INSERT INTO employees (name, html_score, css_score, javascript_score, python_score, java_score, c_score, cpp_score, sql_testing_score, tools_course_score, tsr_role_id) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)"
-            cursor.execute(sql_employee, (data.get('Name'), data.get('HTML', 0), data.get('CSS', 0), data.get('JAVASCRIPT', 0), data.get('PYTHON', 0), data.get('JAVA', 0), data.get('C', 0), data.get('CPP', 0), data.get('SQL_TESTING', 0), data.get('TOOLS_COURSE', 0), 1))
+            cursor.execute(sql_employee, (data.get('Name'), data.get('HTML', 0), data.get('CSS', 0), data.get('JAVASCRIPT', 0), data.get('PYTHON', 0), data.get('JAVA', 0), data.get('C', 0), data.get('CPP', 0), data.get('SQL_TESTING', 0), data.get('TOOLS_COURSE', 0), data.get('TSR_ROLE_ID', 1)))
             new_emp_id = cursor.lastrowid
             
             username = f"{data.get('Name').lower().replace(' ', '')}{new_emp_id}"
@@ -239,6 +296,7 @@ def delete_employee():
         conn.commit()
         
         if cursor.rowcount > 0:
+            invalidate_employee_artifacts([emp_id])
             return jsonify({"success": True, "message": "Employee deleted successfully."})
         else:
             return jsonify({"success": False, "message": "Employee not found."}), 404
@@ -247,4 +305,136 @@ def delete_employee():
         conn.rollback()
         return jsonify({"success": False, "message": str(e)}), 500
     finally:
-        conn.close()
\ No newline at end of file
+        conn.close()
+
+
+# --- Bulk Admin Operations ---
+
+def _resolve_bulk_targets(data):
+    """
+    Resolves the employees a bulk operation applies to, either from an explicit
+    'emp_ids' list or from a 'role_id' filter. Returns (emp_ids, error_message).
+    """
+    if not isinstance(data, dict):
+        return None, "Request body must be a JSON object"
+    if 'emp_ids' in data:
+        emp_ids = data['emp_ids']
+        # bool is an int subclass, so true/false must be rejected explicitly
+        if (not isinstance(emp_ids, list) or not emp_ids
+                or not all(isinstance(emp_id, int) and not isinstance(emp_id, bool) for emp_id in emp_ids)):
+            return None, "emp_ids must be a non-empty list of integer IDs"
+        return sorted(set(emp_ids)), None
+
+    role_id = data.get('role_id')
+    if role_id is None:
+        return None, "Either emp_ids or role_id is required"
+    if not isinstance(role_id, int) or isinstance(role_id, bool):
+        return None, "role_id must be an integer"
+
+    conn = get_db_connection()
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT id FROM employees WHERE tsr_role_id = %s ORDER BY id", (role_id,))
+            return [row['id'] for row in cursor.fetchall()], None
+    finally:
+        conn.close()
+
+def _run_in_batches(emp_ids, statements):
+    """
+    Runs set-based statements over emp_ids in batches of BULK_BATCH_SIZE.
+    Each batch is its own transaction; 'statements' is a list of (sql, extra_params)
+    where the SQL contains an {ids} placeholder for the IN (...) list.
+    The affected count of the last statement is reported for each batch.
+    """
+    results = []
+    conn = get_db_connection()
+    try:
+        for start in range(0, len(emp_ids), BULK_BATCH_SIZE):
+            batch = emp_ids[start:start + BULK_BATCH_SIZE]
+            placeholders = ", ".join(["%s"] * len(batch))
+            try:
+                with conn.cursor() as cursor:
+                    for sql, extra_params in statements:
+                        cursor.execute(sql.format(ids=placeholders), (*extra_params, *batch))
+                    affected = cursor.rowcount
+                conn.commit()
+                results.append({"batch": len(results) + 1, "requested": len(batch), "affected": affected, "success": True})
+            except Exception as e:
+                conn.rollback()
+                results.append({"batch": len(results) + 1, "requested": len(batch), "affected": 0, "success": False, "message": str(e)})
+    finally:
+        conn.close()
+    return results
+
+@admin_bp.route('/employees/bulk_delete', methods=['POST'])
+def bulk_delete_employees():
+    """
+    API endpoint to delete many employees at once, by ID list or by role.
+    """
+    if session.get('role') != 'admin':
+        return jsonify({"success": False, "message": "Unauthorized"}), 401
+
+    emp_ids, error = _resolve_bulk_targets(request.json or {})
+    if error:
+        return jsonify({"success": False, "message": error}), 400
+    # Never let an admin delete their own record as part of a bulk operation
+    emp_ids = [emp_id for emp_id in emp_ids if emp_id != session.get('emp_code')]
+
+    try:
+        results = _run_in_batches(emp_ids, [
+            ("DELETE FROM credentials WHERE emp_id IN ({ids})", ()),
+            ("DELETE FROM learning_path WHERE emp_id IN ({ids})", ()),
+            ("DELETE FROM employees WHERE id IN ({ids})", ()),
+        ])
+        invalidate_employee_artifacts(emp_ids, BULK_BATCH_SIZE)
+    except Exception as e:
+        return jsonify({"success": False, "message": str(e)}), 500
+
+    deleted = sum(r['affected'] for r in results)
+    return jsonify({
+        "success": all(r['success'] for r in results),
+        "message": f"Deleted {deleted} of {len(emp_ids)} employees.",
+        "batches": results
+    })
+
+@admin_bp.route('/employees/bulk_reassign', methods=['POST'])
+def bulk_reassign_role():
+    """
+    API endpoint to move many employees to a new TSR role, by ID list or by current role.
+    """
+    if session.get('role') != 'admin':
+        return jsonify({"success": False, "message": "Unauthorized"}), 401
+
+    data = request.json or {}
+    emp_ids, error = _resolve_bulk_targets(data)
+    if error:
+        return jsonify({"success": False, "message": error}), 400
+    new_role_id = data.get('tsr_role_id')
+    if not isinstance(new_role_id, int) or isinstance(new_role_id, bool):
+        return jsonify({"success": False, "message": "tsr_role_id must be an integer"}), 400
+
+    conn = get_db_connection()
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT role_id FROM tsr_roles WHERE role_id = %s", (new_role_id,))
+            if not cursor.fetchone():
+                return jsonify({"success": False, "message": "Role not found."}), 404
+    except Exception as e:
+        return jsonify({"success": False, "message": str(e)}), 500
+    finally:
+        conn.close()
+
+    try:
+        results = _run_in_batches(emp_ids, [
+            ("UPDATE employees SET tsr_role_id = %s WHERE id IN ({ids})", (new_role_id,)),
+        ])
+        invalidate_employee_artifacts(emp_ids, BULK_BATCH_SIZE)
+    except Exception as e:
+        return jsonify({"success": False, "message": str(e)}), 500
+
+    updated = sum(r['affected'] for r in results)
+    return jsonify({
+        "success": all(r['success'] for r in results),
+        "message": f"Reassigned {updated} of {len(emp_ids)} employees.",
+        "batches": results
+    })
\ No newline at end of file
@@ -1,9 +1,16 @@
 import os
 from langchain_google_genai import ChatGoogleGenerativeAI
 import pandas as pd
-from db import get_db_connection
+from db import get_db_connection, get_read_connection
+from artifact_cache import fingerprint, get_artifact, has_artifact, put_artifact, pooled_count, push_pooled, pop_pooled
 import random
 import json
+import asyncio
+import re
+import threading
+import itertools
+from collections import namedtuple
+import orjson
 
 # Initialize the Language Model
 GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY", "YOUR_API_KEY_HERE")
@@ -18,13 +25,289 @@ def call_ai(prompt: str):
     except Exception as e:
         return f'{{"error": "AI Error: {str(e)}"}}'
 
-# --- NEW: Profile Agent for Inferring Skill Vectors ---
-def profile_agent_get_vectors(emp_id: int):
+async def acall_ai(prompt: str):
+    """Async counterpart of call_ai; awaits the model instead of blocking a worker thread."""
+    try:
+        response = await llm.ainvoke(prompt)
+        clean_response = response.content.strip().replace("```json", "").replace("```", "").strip()
+        return clean_response
+    except Exception as e:
+        return f'{{"error": "AI Error: {str(e)}"}}'
+
+async def astream_ai(prompt: str):
+    """Streams the model's response as text chunks using llm.astream."""
+    try:
+        async for chunk in llm.astream(prompt):
+            if chunk.content:
+                yield chunk.content
+    except Exception as e:
+        yield f"AI Error: {str(e)}"
+
+# --- Structured (Schema-Constrained) Output ---
+# Response schemas sent to Gemini so the model returns JSON of the expected shape.
+SLIDE_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "title": {"type": "string"},
+        "image_url": {"type": "string"},
+        "concept": {"type": "string"},
+        "example": {"type": "string"},
+    },
+    "required": ["title", "image_url", "concept", "example"],
+}
+
+QUIZ_SCHEMA = {
+    "type": "array",
+    "items": {
+        "type": "object",
+        "properties": {
+            "question": {"type": "string"},
+            "options": {"type": "array", "items": {"type": "string"}},
+            "correctAnswerIndex": {"type": "integer"},
+        },
+        "required": ["question", "options", "correctAnswerIndex"],
+    },
+}
+
+PROFILE_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "skill_vectors": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {"skill": {"type": "string"}, "level": {"type": "string"}},
+                "required": ["skill", "level"],
+            },
+        },
+        "history_logs": {"type": "array", "items": {"type": "string"}},
+    },
+    "required": ["skill_vectors", "history_logs"],
+}
+
+TRACKER_SCHEMA = {
+    "type": "object",
+    "properties": {"summary": {"type": "string"}, "details": {"type": "string"}},
+    "required": ["summary", "details"],
+}
+
+_FENCE_RE = re.compile(r"```(?:json)?\s*(.*?)```", re.DOTALL)
+_SCHEMA_TYPES = {"object": dict, "array": list, "string": str, "integer": int}
+
+# Per-agent counters: calls, responses fixed by the repair call, and responses that never parsed.
+# They live in process memory, so under a multi-worker server each worker counts only its own calls.
+_parse_stats = {}
+_parse_stats_lock = threading.Lock()
+
+def _balanced_spans(text: str):
+    """Yields every bracket-balanced {...} / [...] span in text, ignoring brackets inside strings."""
+    for start, opener in enumerate(text):
+        if opener not in '{[':
+            continue
+        depth, in_string, escaped = 0, False, False
+        for i in range(start, len(text)):
+            char = text[i]
+            if in_string:
+                if escaped:
+                    escaped = False
+                elif char == '\\':
+                    escaped = True
+                elif char == '"':
+                    in_string = False
+            elif char == '"':
+                in_string = True
+            elif char in '{[':
+                depth += 1
+            elif char in '}]':
+                depth -= 1
+                if depth == 0:
+                    yield text[start:i + 1]
+                    break
+
+def _strip_trailing_commas(text: str):
+    """Drops commas directly before a closing bracket, leaving string contents untouched."""
+    out, in_string, escaped = [], False, False
+    for i, char in enumerate(text):
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == '\\':
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char == ',' and text[i + 1:].lstrip()[:1] in ('}', ']'):
+            continue
+        out.append(char)
+    return ''.join(out)
+
+def _matches_schema(value, schema) -> bool:
+    """Checks value against the subset of JSON Schema used here: type, required, properties and items."""
+    expected_type = _SCHEMA_TYPES.get(schema.get("type"))
+    if expected_type is not None and (not isinstance(value, expected_type) or isinstance(value, bool)):
+        return False
+    if isinstance(value, dict):
+        if any(key not in value for key in schema.get("required", ())):
+            return False
+        return all(_matches_schema(value[key], sub) for key, sub in schema.get("properties", {}).items() if key in value)
+    if isinstance(value, list) and "items" in schema:
+        return all(_matches_schema(item, schema["items"]) for item in value)
+    return True
+
+def extract_json(text: str, schema=None):
     """
-    Acts as a Profile Agent to analyze an employee's full history and infer
-    latent skill vectors, as described in the provided image.
+    Tolerantly extracts a JSON value from a model response.
+    Handles markdown fences, surrounding prose (including stray brackets) and trailing commas.
+    If a schema is given, only a value matching its types, required keys and item shapes
+    is accepted. Raises ValueError if none is found.
     """
-    conn = get_db_connection()
+    text = text.strip()
+    fenced = _FENCE_RE.search(text)
+    candidates = [text] + ([fenced.group(1).strip()] if fenced else [])
+    for candidate in itertools.chain(candidates, _balanced_spans(text)):
+        for attempt in (candidate, _strip_trailing_commas(candidate)):
+            try:
+                value = orjson.loads(attempt)
+            except orjson.JSONDecodeError:
+                continue
+            if schema is None or _matches_schema(value, schema):
+                return value
+    raise ValueError("No JSON value of the expected shape found in AI response.")
+
+def _record_parse(agent: str, outcome: str):
+    with _parse_stats_lock:
+        stats = _parse_stats.setdefault(agent, {"calls": 0, "repaired": 0, "failed": 0})
+        stats["calls"] += 1
+        if outcome != "ok":
+            stats[outcome] += 1
+
+def get_parse_stats():
+    """Returns a snapshot of this process's per-agent parse counters with a failure rate."""
+    with _parse_stats_lock:
+        snapshot = {agent: dict(stats) for agent, stats in _parse_stats.items()}
+    for stats in snapshot.values():
+        stats["failure_rate"] = f"{(stats['failed'] / stats['calls']) * 100:.2f}%"
+    return snapshot
+
+def _structured_kwargs(schema):
+    return {"response_mime_type": "application/json", "response_schema": schema}
+
+def _repair_prompt(raw_response: str, schema):
+    return f"The following text was meant to be JSON matching this schema: {json.dumps(schema)}. Fix it and return ONLY the corrected JSON, without changing its content.\n\n{raw_response}"
+
+_NEEDS_REPAIR = object()
+
+def _structured_result(agent: str, schema, raw_response: str, repaired_response=_NEEDS_REPAIR):
+    """
+    Parses a structured response and records the outcome for agent.
+    Returns _NEEDS_REPAIR when the first response did not parse and no repair was tried yet;
+    pass the repair call's text (or None if that call failed) to finish.
+    """
+    try:
+        result = extract_json(raw_response, schema)
+        _record_parse(agent, "ok")
+        return result
+    except ValueError:
+        if repaired_response is _NEEDS_REPAIR:
+            return _NEEDS_REPAIR
+    try:
+        result = extract_json(repaired_response or "", schema)
+        _record_parse(agent, "repaired")
+        return result
+    except ValueError:
+        _record_parse(agent, "failed")
+        return {"error": "Failed to parse AI response as JSON.", "raw_response": raw_response}
+
+def call_ai_json(prompt: str, schema, agent: str, throttle=None):
+    """
+    Requests schema-constrained JSON from the model and parses it tolerantly.
+    If parsing fails, one short repair call is made before giving up.
+    throttle, if given, is called before every model request, including the repair.
+    """
+    def invoke(text):
+        if throttle:
+            throttle()
+        return llm.invoke(text, **_structured_kwargs(schema)).content
+
+    try:
+        raw_response = invoke(prompt)
+    except Exception as e:
+        return {"error": f"AI Error: {str(e)}"}
+    result = _structured_result(agent, schema, raw_response)
+    if result is _NEEDS_REPAIR:
+        try:
+            repaired = invoke(_repair_prompt(raw_response, schema))
+        except Exception:
+            repaired = None
+        result = _structured_result(agent, schema, raw_response, repaired)
+    return result
+
+async def acall_ai_json(prompt: str, schema, agent: str):
+    """Async counterpart of call_ai_json."""
+    async def invoke(text):
+        return (await llm.ainvoke(text, **_structured_kwargs(schema))).content
+
+    try:
+        raw_response = await invoke(prompt)
+    except Exception as e:
+        return {"error": f"AI Error: {str(e)}"}
+    result = _structured_result(agent, schema, raw_response)
+    if result is _NEEDS_REPAIR:
+        try:
+            repaired = await invoke(_repair_prompt(raw_response, schema))
+        except Exception:
+            repaired = None
+        result = _structured_result(agent, schema, raw_response, repaired)
+    return result
+
+# --- Precomputed Artifact Cache ---
+# An AIRequest describes one cacheable generation: its cache key, the prompt (whose
+# hash is the cache's input fingerprint), the response schema (None for plain text)
+# and the agent name used for parse statistics.
+AIRequest = namedtuple('AIRequest', ['key', 'prompt', 'schema', 'agent'])
+
+def _is_ai_error(result):
+    if isinstance(result, dict):
+        return "error" in result
+    return isinstance(result, str) and result.startswith('{"error"')
+
+def _generate(req: AIRequest, throttle=None):
+    if req.schema is None:
+        if throttle:
+            throttle()
+        return call_ai(req.prompt)
+    return call_ai_json(req.prompt, req.schema, req.agent, throttle)
+
+async def _agenerate(req: AIRequest):
+    return await acall_ai(req.prompt) if req.schema is None else await acall_ai_json(req.prompt, req.schema, req.agent)
+
+def _cached(req: AIRequest):
+    """Serves an artifact precomputed for the same prompt, otherwise generates and stores it."""
+    input_hash = fingerprint(req.prompt)
+    cached = get_artifact(req.key, input_hash)
+    if cached is not None:
+        return cached
+    result = _generate(req)
+    if not _is_ai_error(result):
+        put_artifact(req.key, input_hash, result)
+    return result
+
+async def _acached(req: AIRequest):
+    """Async counterpart of _cached; cache lookups run off the event loop."""
+    input_hash = fingerprint(req.prompt)
+    cached = await asyncio.to_thread(get_artifact, req.key, input_hash)
+    if cached is not None:
+        return cached
+    result = await _agenerate(req)
+    if not _is_ai_error(result):
+        await asyncio.to_thread(put_artifact, req.key, input_hash, result)
+    return result
+
+# --- NEW: Profile Agent for Inferring Skill Vectors ---
+def _fetch_profile_inputs(emp_id: int):
+    """Gathers the HR profile, course completions and assessment scores for the Profile Agent."""
+    conn = get_read_connection()
     try:
         with conn.cursor() as cursor:
             # 1. GATHER INPUTS: HR/ERP data, past course completions, performance ratings
@@ -32,7 +315,7 @@ def profile_agent_get_vectors(emp_id: int):
             cursor.execute("SELECT * FROM employees WHERE id = %s", (emp_id,))
             employee_profile = cursor.fetchone()
             if not employee_profile:
-                return {"error": "Employee not found"}
+                return None, None, None
 
             # Gathering past course completions
             cursor.execute("""
@@ -52,9 +335,14 @@ def profile_agent_get_vectors(emp_id: int):
                 WHERE lp.emp_id = %s
             """, (emp_id,))
             performance_ratings = cursor.fetchall()
+        return employee_profile, course_completions, performance_ratings
+    finally:
+        if conn and conn.open:
+            conn.close()
 
-        # 2. DEFINE PROCESS: Infer latent skills by correlating disparate data
-        prompt = f"""
+def _profile_prompt(employee_profile, course_completions, performance_ratings):
+    # 2. DEFINE PROCESS: Infer latent skills by correlating disparate data
+    return f"""
         You are an AI Profile Agent. Your task is to analyze an employee's comprehensive data to infer latent skill vectors and produce a structured profile.
 
         Here is the employee's disparate data:
@@ -72,27 +360,34 @@ def profile_agent_get_vectors(emp_id: int):
         - "history_logs": An array of strings summarizing key milestones or observations.
         """
 
-        # 3. GET OUTPUT: Call the AI and parse the response
-        response_str = call_ai(prompt)
-        try:
-            return json.loads(response_str)
-        except json.JSONDecodeError:
-            return {"error": "Failed to parse AI response as JSON.", "raw_response": response_str}
+def profile_agent_get_vectors(emp_id: int):
+    """
+    Acts as a Profile Agent to analyze an employee's full history and infer
+    latent skill vectors, as described in the provided image.
+    """
+    try:
+        employee_profile, course_completions, performance_ratings = _fetch_profile_inputs(emp_id)
+        if not employee_profile:
+            return {"error": "Employee not found"}
+        return call_ai_json(_profile_prompt(employee_profile, course_completions, performance_ratings), PROFILE_SCHEMA, "Profile_Agent")
+    except Exception as e:
+        return {"error": f"An error occurred during profile agent analysis: {str(e)}"}
 
+async def aprofile_agent_get_vectors(emp_id: int):
+    """Async variant of profile_agent_get_vectors."""
+    try:
+        employee_profile, course_completions, performance_ratings = await asyncio.to_thread(_fetch_profile_inputs, emp_id)
+        if not employee_profile:
+            return {"error": "Employee not found"}
+        return await acall_ai_json(_profile_prompt(employee_profile, course_completions, performance_ratings), PROFILE_SCHEMA, "Profile_Agent")
     except Exception as e:
         return {"error": f"An error occurred during profile agent analysis: {str(e)}"}
-    finally:
-        if conn and conn.open:
-            conn.close()
 
 
 # --- Tracker Agent for Analyzing Learner Progress ---
-def tracker_agent_analysis(emp_id: int):
-    """
-    Analyzes an employee's learning patterns, completion history, and quiz scores.
-    Uses AI to detect plateaus and provide a summary.
-    """
-    conn = get_db_connection()
+def _fetch_tracker_history(emp_id: int):
+    """Fetches the course and assessment history the Tracker Agent analyses."""
+    conn = get_read_connection()
     try:
         with conn.cursor() as cursor:
             # Fetch course history
@@ -114,12 +409,14 @@ def tracker_agent_analysis(emp_id: int):
                 ORDER BY aa.attempt_date DESC
             """, (emp_id,))
             assessment_history = cursor.fetchall()
+        return course_history, assessment_history
+    finally:
+        if conn and conn.open:
+            conn.close()
 
-        if not course_history and not assessment_history:
-            return {"summary": "No learning activity found.", "details": "Start a course to begin tracking your progress."}
-
-        # Use AI to analyze the data and generate a narrative
-        prompt = f"""
+def _tracker_prompt(course_history, assessment_history):
+    # Use AI to analyze the data and generate a narrative
+    return f"""
         You are an AI Learning Tracker Agent. Your task is to analyze an employee's learning data and provide a concise, analytical summary.
 
         Here is the employee's data:
@@ -134,18 +431,38 @@ def tracker_agent_analysis(emp_id: int):
 
         Format your response as a simple JSON object with two keys: "summary" (a one-sentence headline) and "details" (a single string containing your full analysis with markdown for bolding and bullet points).
         """
-        
-        response_str = call_ai(prompt)
-        try:
-            return json.loads(response_str)
-        except json.JSONDecodeError:
-            return {"summary": "Analysis Complete", "details": response_str}
 
+def _tracker_request(emp_id: int, course_history, assessment_history):
+    return AIRequest(f"tracker:{emp_id}", _tracker_prompt(course_history, assessment_history), TRACKER_SCHEMA, "Tracker_Agent")
+
+def _tracker_result(result):
+    # Keep the old behaviour of showing the raw text when the JSON could not be recovered
+    if "raw_response" in result:
+        return {"summary": "Analysis Complete", "details": result["raw_response"]}
+    return result
+
+def tracker_agent_analysis(emp_id: int):
+    """
+    Analyzes an employee's learning patterns, completion history, and quiz scores.
+    Uses AI to detect plateaus and provide a summary.
+    """
+    try:
+        course_history, assessment_history = _fetch_tracker_history(emp_id)
+        if not course_history and not assessment_history:
+            return {"summary": "No learning activity found.", "details": "Start a course to begin tracking your progress."}
+        return _tracker_result(_cached(_tracker_request(emp_id, course_history, assessment_history)))
+    except Exception as e:
+        return {"summary": "Error", "details": f"An error occurred during analysis: {e}"}
+
+async def atracker_agent_analysis(emp_id: int):
+    """Async variant of tracker_agent_analysis."""
+    try:
+        course_history, assessment_history = await asyncio.to_thread(_fetch_tracker_history, emp_id)
+        if not course_history and not assessment_history:
+            return {"summary": "No learning activity found.", "details": "Start a course to begin tracking your progress."}
+        return _tracker_result(await _acached(_tracker_request(emp_id, course_history, assessment_history)))
     except Exception as e:
         return {"summary": "Error", "details": f"An error occurred during analysis: {e}"}
-    finally:
-        if conn and conn.open:
-            conn.close()
 
 
 # --- Existing Admin-Facing Agents ---
@@ -177,25 +494,73 @@ def hr_agent_bulk_onboard(df: pd.DataFrame):
     finally:
         conn.close()
 
-def generate_employee_analysis_agent(emp_id: int):
-    conn = get_db_connection()
+def _fetch_employee_with_role(emp_id: int):
+    conn = get_read_connection()
     try:
         with conn.cursor() as cursor:
             cursor.execute("SELECT e.*, tr.role_name FROM employees e LEFT JOIN tsr_roles tr ON e.tsr_role_id = tr.role_id WHERE e.id = %s", (emp_id,))
-            employee = cursor.fetchone()
-            if not employee: return None, None, None, "Employee not found."
-        skill_columns = {'HTML': 'html_score', 'CSS': 'css_score', 'JavaScript': 'javascript_score', 'Python': 'python_score', 'Java': 'java_score', 'C': 'c_score', 'C++': 'cpp_score', 'SQL Testing': 'sql_testing_score', 'Testing Tools': 'tools_course_score'}
-        skills = {name: employee.get(col, 0) for name, col in skill_columns.items()}
-        sorted_skills = sorted(skills.items(), key=lambda x: x[1], reverse=True)
-        top_skills, weak_skills = dict(sorted_skills[:3]), dict(sorted_skills[-3:])
-        employee_details = { "Name": employee.get('name'), "Role": employee.get('role_name') }
-        prompt = f"You are an expert AI Career Development Analyst. Provide a concise, actionable upskilling roadmap. Employee Name: {employee_details['Name']}, TSR Role: {employee_details['Role']}, Full Skill Profile (Score out of 100): {skills}. Generate a report with markdown for: **Overall Summary**, **Key Strengths**, **Recommended Upskilling Roadmap**, and **Concluding Remark**."
-        analysis_text = call_ai(prompt)
+            return cursor.fetchone()
+    finally:
+        if conn and conn.open: conn.close()
+
+def _analysis_inputs(employee):
+    skill_columns = {'HTML': 'html_score', 'CSS': 'css_score', 'JavaScript': 'javascript_score', 'Python': 'python_score', 'Java': 'java_score', 'C': 'c_score', 'C++': 'cpp_score', 'SQL Testing': 'sql_testing_score', 'Testing Tools': 'tools_course_score'}
+    skills = {name: employee.get(col, 0) for name, col in skill_columns.items()}
+    sorted_skills = sorted(skills.items(), key=lambda x: x[1], reverse=True)
+    top_skills, weak_skills = dict(sorted_skills[:3]), dict(sorted_skills[-3:])
+    employee_details = { "Name": employee.get('name'), "Role": employee.get('role_name') }
+    prompt = f"You are an expert AI Career Development Analyst. Provide a concise, actionable upskilling roadmap. Employee Name: {employee_details['Name']}, TSR Role: {employee_details['Role']}, Full Skill Profile (Score out of 100): {skills}. Generate a report with markdown for: **Overall Summary**, **Key Strengths**, **Recommended Upskilling Roadmap**, and **Concluding Remark**."
+    return employee_details, top_skills, weak_skills, prompt
+
+def _report_request(emp_id: int, prompt: str):
+    return AIRequest(f"report:{emp_id}", prompt, None, "Analysis_Agent")
+
+def generate_employee_analysis_agent(emp_id: int):
+    try:
+        employee = _fetch_employee_with_role(emp_id)
+        if not employee: return None, None, None, "Employee not found."
+        employee_details, top_skills, weak_skills, prompt = _analysis_inputs(employee)
+        analysis_text = _cached(_report_request(emp_id, prompt))
         return employee_details, top_skills, weak_skills, analysis_text
     except Exception as e:
         return None, None, None, f"An error occurred: {e}"
-    finally:
-        if conn and conn.open: conn.close()
+
+async def agenerate_employee_analysis_agent(emp_id: int):
+    """Async variant of generate_employee_analysis_agent."""
+    try:
+        employee = await asyncio.to_thread(_fetch_employee_with_role, emp_id)
+        if not employee: return None, None, None, "Employee not found."
+        employee_details, top_skills, weak_skills, prompt = _analysis_inputs(employee)
+        analysis_text = await _acached(_report_request(emp_id, prompt))
+        return employee_details, top_skills, weak_skills, analysis_text
+    except Exception as e:
+        return None, None, None, f"An error occurred: {e}"
+
+async def astream_employee_analysis(emp_id: int):
+    """
+    Streaming variant of generate_employee_analysis_agent.
+    Returns None if the employee does not exist, otherwise an async generator
+    yielding the analysis text as it is produced. A cached report is yielded in
+    one piece; a freshly streamed one is cached once complete.
+    """
+    employee = await asyncio.to_thread(_fetch_employee_with_role, emp_id)
+    if not employee:
+        return None
+    return _astream_report(_report_request(emp_id, _analysis_inputs(employee)[3]))
+
+async def _astream_report(req: AIRequest):
+    input_hash = fingerprint(req.prompt)
+    cached = await asyncio.to_thread(get_artifact, req.key, input_hash)
+    if cached is not None:
+        yield cached
+        return
+    chunks = []
+    async for chunk in astream_ai(req.prompt):
+        chunks.append(chunk)
+        yield chunk
+    analysis_text = "".join(chunks)
+    if "AI Error:" not in analysis_text:
+        await asyncio.to_thread(put_artifact, req.key, input_hash, analysis_text)
 
 # --- Existing Employee-Facing Agents ---
 def recommender_agent_create_path(emp_id: int):
@@ -228,18 +593,86 @@ def recommender_agent_create_path(emp_id: int):
     finally:
         conn.close()
 
+def _slide_prompt(course_name: str, slide_number: int, total_slides: int):
+    return f"You are an AI Instructional Designer. Generate content for slide {slide_number}/{total_slides} of the course \"{course_name}\". Return a JSON object with \"title\", \"image_url\" (using placehold.co), \"concept\", and \"example\"."
+
+def _quiz_prompt(course_name: str):
+    return f"You are an AI Quiz Generator. Create a 5-question multiple-choice quiz for the course \"{course_name}\". For each question, provide 4 options. Return ONLY a valid JSON array of objects. Each object must have: \"question\", \"options\", and \"correctAnswerIndex\"."
+
+def _slide_request(course_name: str, slide_number: int, total_slides: int):
+    return AIRequest(f"slide:{course_name}:{slide_number}/{total_slides}", _slide_prompt(course_name, slide_number, total_slides), SLIDE_SCHEMA, "Course_Content_Agent")
+
+def _quiz_request(course_name: str):
+    return AIRequest(f"quiz:{course_name}", _quiz_prompt(course_name), QUIZ_SCHEMA, "Assessment_Agent")
+
 def course_content_agent(course_name: str, slide_number: int, total_slides: int):
-    prompt = f"You are an AI Instructional Designer. Generate content for slide {slide_number}/{total_slides} of the course \"{course_name}\". Return a JSON object with \"title\", \"image_url\" (using placehold.co), \"concept\", and \"example\"."
-    response_str = call_ai(prompt)
-    try:
-        return json.loads(response_str)
-    except json.JSONDecodeError:
-        return {"error": "Failed to parse AI response as JSON.", "raw_response": response_str}
+    return _cached(_slide_request(course_name, slide_number, total_slides))
+
+async def acourse_content_agent(course_name: str, slide_number: int, total_slides: int):
+    return await _acached(_slide_request(course_name, slide_number, total_slides))
 
 def assessment_question_agent(course_name: str):
-    prompt = f"You are an AI Quiz Generator. Create a 5-question multiple-choice quiz for the course \"{course_name}\". For each question, provide 4 options. Return ONLY a valid JSON array of objects. Each object must have: \"question\", \"options\", and \"correctAnswerIndex\"."
-    response_str = call_ai(prompt)
-    try:
-        return json.loads(response_str)
-    except json.JSONDecodeError:
-        return {"error": "Failed to parse AI response as JSON.", "raw_response": response_str}
\ No newline at end of file
+    """
+    Serves a quiz precomputed by the warmup command if one is pooled, otherwise generates one.
+    Pooled quizzes are removed as they are served, so no quiz is handed out twice.
+    """
+    req = _quiz_request(course_name)
+    pooled = pop_pooled(req.key, fingerprint(req.prompt))
+    return pooled if pooled is not None else _generate(req)
+
+async def aassessment_question_agent(course_name: str):
+    """Async variant of assessment_question_agent."""
+    req = _quiz_request(course_name)
+    pooled = await asyncio.to_thread(pop_pooled, req.key, fingerprint(req.prompt))
+    return pooled if pooled is not None else await _agenerate(req)
+
+
+# --- Warmup Support ---
+def _generate_or_raise(req: AIRequest, throttle=None):
+    result = _generate(req, throttle)
+    if _is_ai_error(result):
+        raise RuntimeError(result["error"] if isinstance(result, dict) else result)
+    return result
+
+def warm_artifact(kind: str, target, throttle=None):
+    """
+    Precomputes one artifact for the warmup CLI.
+    kind is 'slide' (target = (course_name, slide_number, total_slides)),
+    'quiz' (target = (course_name, pool_size)), 'report' or 'tracker' (emp_id).
+    Returns 'skipped' when an artifact built from the same inputs already exists
+    (or the quiz pool is full), 'generated' otherwise; raises RuntimeError if
+    generation fails. A quiz task tops its pool up to pool_size, so callers must
+    run at most one per course at a time. throttle, if given, is called before
+    every LLM request.
+    """
+    pool_size = None
+    if kind == 'slide':
+        req = _slide_request(*target)
+    elif kind == 'quiz':
+        course_name, pool_size = target
+        req = _quiz_request(course_name)
+    elif kind == 'report':
+        employee = _fetch_employee_with_role(target)
+        if not employee:
+            return 'skipped'
+        req = _report_request(target, _analysis_inputs(employee)[3])
+    elif kind == 'tracker':
+        course_history, assessment_history = _fetch_tracker_history(target)
+        if not course_history and not assessment_history:
+            return 'skipped'
+        req = _tracker_request(target, course_history, assessment_history)
+    else:
+        raise ValueError(f"Unknown artifact kind: {kind}")
+
+    input_hash = fingerprint(req.prompt)
+    if pool_size is not None:
+        missing = pool_size - pooled_count(req.key, input_hash)
+        if missing <= 0:
+            return 'skipped'
+        for _ in range(missing):
+            push_pooled(req.key, input_hash, _generate_or_raise(req, throttle))
+        return 'generated'
+    if has_artifact(req.key, input_hash):
+        return 'skipped'
+    put_artifact(req.key, input_hash, _generate_or_raise(req, throttle))
+    return 'generated'
@@ -2,21 +2,29 @@ from flask import Flask, render_template, session, redirect, url_for
 from flask_cors import CORS
 import os
 from db import get_db_connection
+from json_provider import OrjsonProvider
+from compression import init_compression
 
 # Import Blueprints
 from auth_routes import auth_bp
 from admin_routes import admin_bp
 from employee_routes import employee_bp
+from warmup import warmup_command
 
 app = Flask(__name__, static_folder='static', template_folder='templates')
 app.secret_key = os.getenv('SECRET_KEY', 'a_very_secret_key')
+app.json = OrjsonProvider(app)
 CORS(app, supports_credentials=True)
+init_compression(app)
 
 # Register Blueprints for different parts of the application
 app.register_blueprint(auth_bp)
 app.register_blueprint(admin_bp, url_prefix='/admin')
 app.register_blueprint(employee_bp, url_prefix='/employee')
 
+# CLI: `flask warmup` precomputes AI artifacts ahead of peak hours
+app.cli.add_command(warmup_command)
+
 
 @app.route('/')
 def home():
@@ -0,0 +1,179 @@
+import hashlib
+import orjson
+from db import get_db_connection
+
+# Precomputed AI artifacts (slides, reports, tracker summaries).
+# Each row stores a hash of the inputs it was generated from, so a changed
+# profile or prompt is treated as a miss instead of serving stale content.
+# Quizzes are different: each one is served once, so they live in a pool of
+# precomputed entries that are removed as they are handed out.
+_CREATE_TABLE_SQL = ("""
+    CREATE TABLE IF NOT EXISTS ai_artifacts (
+        artifact_key VARCHAR(255) PRIMARY KEY,
+        input_hash CHAR(64) NOT NULL,
+        payload LONGTEXT NOT NULL,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+    )
+""", """
+    CREATE TABLE IF NOT EXISTS ai_artifact_pool (
+        pool_id BIGINT AUTO_INCREMENT PRIMARY KEY,
+        pool_key VARCHAR(255) NOT NULL,
+        input_hash CHAR(64) NOT NULL,
+        payload LONGTEXT NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        INDEX idx_pool_key (pool_key, input_hash)
+    )
+""")
+
+_table_ready = False
+
+def fingerprint(*inputs) -> str:
+    """Returns a stable SHA-256 hash of the inputs an artifact is generated from."""
+    encoded = orjson.dumps(inputs, default=str, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS)
+    return hashlib.sha256(encoded).hexdigest()
+
+def _connect():
+    global _table_ready
+    # Cache writes must not pin the user's session to the primary
+    conn = get_db_connection(track_writes=False)
+    if not _table_ready:
+        try:
+            with conn.cursor() as cursor:
+                for sql in _CREATE_TABLE_SQL:
+                    cursor.execute(sql)
+            conn.commit()
+        except Exception:
+            conn.close()
+            raise
+        _table_ready = True
+    return conn
+
+def get_artifact(key: str, input_hash: str):
+    """
+    Returns the cached payload for key if it was built from the same inputs, else None.
+    Cache errors are treated as a miss so the caller falls back to the LLM.
+    """
+    try:
+        conn = _connect()
+    except Exception:
+        return None
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT payload FROM ai_artifacts WHERE artifact_key = %s AND input_hash = %s", (key, input_hash))
+            row = cursor.fetchone()
+        return orjson.loads(row['payload']) if row else None
+    except Exception:
+        return None
+    finally:
+        conn.close()
+
+def has_artifact(key: str, input_hash: str) -> bool:
+    """Checks whether an up-to-date artifact exists without loading its payload."""
+    conn = _connect()
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT 1 FROM ai_artifacts WHERE artifact_key = %s AND input_hash = %s", (key, input_hash))
+            return cursor.fetchone() is not None
+    finally:
+        conn.close()
+
+def put_artifact(key: str, input_hash: str, payload):
+    """Stores (or replaces) the artifact for key. Failures are ignored; caching is best-effort."""
+    try:
+        conn = _connect()
+    except Exception:
+        return
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute(
+                "REPLACE INTO ai_artifacts (artifact_key, input_hash, payload) VALUES (%s, %s, %s)",
+                (key, input_hash, orjson.dumps(payload, default=str).decode())
+            )
+        conn.commit()
+    except Exception:
+        conn.rollback()
+    finally:
+        conn.close()
+
+def invalidate_employee_artifacts(emp_ids, batch_size: int = 500):
+    """
+    Removes the per-employee artifacts (admin reports and tracker summaries) for emp_ids.
+    Best-effort like put_artifact: returns the number of rows removed, 0 on error.
+    """
+    emp_ids = list(emp_ids)
+    if not emp_ids:
+        return 0
+    removed = 0
+    try:
+        conn = _connect()
+    except Exception:
+        return 0
+    try:
+        for start in range(0, len(emp_ids), batch_size):
+            keys = [f"{kind}:{emp_id}" for emp_id in emp_ids[start:start + batch_size] for kind in ('report', 'tracker')]
+            with conn.cursor() as cursor:
+                cursor.execute(f"DELETE FROM ai_artifacts WHERE artifact_key IN ({', '.join(['%s'] * len(keys))})", keys)
+                removed += cursor.rowcount
+            conn.commit()
+        return removed
+    except Exception:
+        conn.rollback()
+        return removed
+    finally:
+        conn.close()
+
+def pooled_count(key: str, input_hash: str) -> int:
+    """Returns how many unserved pooled artifacts exist for key and inputs."""
+    conn = _connect()
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT COUNT(*) AS n FROM ai_artifact_pool WHERE pool_key = %s AND input_hash = %s", (key, input_hash))
+            return cursor.fetchone()['n']
+    finally:
+        conn.close()
+
+def push_pooled(key: str, input_hash: str, payload):
+    """Adds an artifact to the pool for key, dropping entries built from older inputs."""
+    conn = _connect()
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute("DELETE FROM ai_artifact_pool WHERE pool_key = %s AND input_hash <> %s", (key, input_hash))
+            cursor.execute(
+                "INSERT INTO ai_artifact_pool (pool_key, input_hash, payload) VALUES (%s, %s, %s)",
+                (key, input_hash, orjson.dumps(payload, default=str).decode())
+            )
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+def pop_pooled(key: str, input_hash: str):
+    """
+    Removes and returns one pooled artifact for key, or None if the pool is empty.
+    Each entry is handed out at most once. Errors count as an empty pool.
+    """
+    try:
+        conn = _connect()
+    except Exception:
+        return None
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute(
+                "SELECT pool_id, payload FROM ai_artifact_pool WHERE pool_key = %s AND input_hash = %s "
+                "ORDER BY pool_id LIMIT 1 FOR UPDATE SKIP LOCKED",
+                (key, input_hash)
+            )
+            row = cursor.fetchone()
+            if not row:
+                conn.rollback()
+                return None
+            cursor.execute("DELETE FROM ai_artifact_pool WHERE pool_id = %s", (row['pool_id'],))
+        conn.commit()
+        return orjson.loads(row['payload'])
+    except Exception:
+        conn.rollback()
+        return None
+    finally:
+        conn.close()
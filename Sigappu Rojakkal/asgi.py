@@ -0,0 +1,113 @@
+"""
+ASGI entrypoint for serving the LLM-heavy routes concurrently.
+
+    uvicorn asgi:application --host 0.0.0.0 --port 5000
+
+Endpoints whose view has an @async_variant (slide content, quiz questions,
+tracker analysis, AI report, profile agent) are awaited directly on uvicorn's
+single event loop, so one process can hold hundreds of in-flight Gemini calls.
+Every other route is handed to the regular Flask WSGI app, running on a pool of
+WSGI_THREADS threads (default 32) like a threaded WSGI server would.
+"""
+import os
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from asgiref.sync import sync_to_async
+from asgiref.wsgi import WsgiToAsgi, WsgiToAsgiInstance
+from flask import request
+from werkzeug.exceptions import HTTPException
+
+from app import app
+
+_wsgi_executor = ThreadPoolExecutor(max_workers=int(os.getenv('WSGI_THREADS', '32')), thread_name_prefix='wsgi')
+
+
+class _ThreadPoolWsgiInstance(WsgiToAsgiInstance):
+    # asgiref runs WSGI apps thread-sensitively, i.e. every request on one shared thread.
+    # Dispatch to our own pool instead so sync routes run concurrently.
+    run_wsgi_app = sync_to_async(WsgiToAsgiInstance.__dict__['run_wsgi_app'].func,
+                                 thread_sensitive=False, executor=_wsgi_executor)
+
+
+class _ThreadPoolWsgiToAsgi(WsgiToAsgi):
+    async def __call__(self, scope, receive, send):
+        await _ThreadPoolWsgiInstance(self.wsgi_application)(scope, receive, send)
+
+
+_wsgi_application = _ThreadPoolWsgiToAsgi(app)
+
+
+def _find_async_view(scope):
+    """Returns the async variant registered for the request's endpoint, if any."""
+    host = dict(scope.get('headers', [])).get(b'host', b'localhost').decode('latin1')
+    adapter = app.url_map.bind(host, script_name=scope.get('root_path') or None, url_scheme=scope.get('scheme', 'http'))
+    try:
+        endpoint, _ = adapter.match(scope['path'], method=scope['method'])
+    except HTTPException:
+        return None
+    return getattr(app.view_functions.get(endpoint), 'async_variant', None)
+
+
+async def _read_body(receive):
+    body = b''
+    while True:
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            break
+        body += message.get('body', b'')
+        if not message.get('more_body'):
+            break
+    return body
+
+
+async def _send_response(response, send):
+    await send({
+        'type': 'http.response.start',
+        'status': response.status_code,
+        'headers': [(name.encode('latin1'), value.encode('latin1')) for name, value in response.headers.items()],
+    })
+    if hasattr(response.response, '__aiter__'):
+        # Streaming responses built from an async generator (e.g. the report stream)
+        async for chunk in response.response:
+            await send({'type': 'http.response.body', 'body': chunk.encode() if isinstance(chunk, str) else chunk, 'more_body': True})
+        await send({'type': 'http.response.body', 'body': b''})
+    else:
+        await send({'type': 'http.response.body', 'body': response.get_data()})
+
+
+async def _dispatch_async(async_view, scope, receive, send):
+    """Runs an async view inside a normal Flask request context (session, before/after_request hooks)."""
+    wsgi_instance = WsgiToAsgiInstance(app)
+    wsgi_instance.scope = scope
+    environ = wsgi_instance.build_environ(scope, BytesIO(await _read_body(receive)))
+
+    with app.request_context(environ):
+        try:
+            try:
+                rv = app.preprocess_request()
+                if rv is None:
+                    rv = await async_view(**request.view_args)
+            except Exception as e:
+                rv = app.handle_user_exception(e)
+            response = app.finalize_request(rv)
+        except Exception as e:
+            response = app.handle_exception(e)
+        await _send_response(response, send)
+
+
+async def application(scope, receive, send):
+    if scope['type'] == 'lifespan':
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async_view = _find_async_view(scope) if scope['type'] == 'http' else None
+    if async_view is None:
+        await _wsgi_application(scope, receive, send)
+    else:
+        await _dispatch_async(async_view, scope, receive, send)
@@ -0,0 +1,12 @@
+def async_variant(sync_view):
+    """
+    Registers the decorated coroutine as the native-async implementation of sync_view.
+
+    Flask itself (WSGI, `flask run`) keeps serving the sync view. When the app is
+    served through asgi.py, requests for that endpoint are awaited on the server's
+    event loop instead, so a slow LLM call no longer holds a worker thread.
+    """
+    def decorator(async_view):
+        sync_view.async_variant = async_view
+        return async_view
+    return decorator
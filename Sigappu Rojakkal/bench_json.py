@@ -0,0 +1,75 @@
+"""
+Micro-benchmark for API response encoding.
+
+Compares Flask's DefaultJSONProvider (stdlib json, sorted keys, HTTP dates) with
+the OrjsonProvider the app ships, on payloads shaped like /admin/employees,
+learning paths and generated quiz/slide JSON. Both are called the way jsonify
+calls them outside debug mode. Reports each body's size uncompressed, gzip and zstd.
+
+    python bench_json.py [--rows 5000] [--repeat 50]
+"""
+import argparse
+import datetime
+import decimal
+import gzip
+import timeit
+
+import zstandard
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+from compression import GZIP_LEVEL, ZSTD_LEVEL
+from json_provider import OrjsonProvider
+
+
+def build_payloads(rows: int):
+    roles = ['Developer', 'Tester', 'Analyst', 'Support']
+    now = datetime.datetime(2024, 1, 1, 9, 30)
+    employees = [{"id": i, "name": f"Employee {i}", "role_name": roles[i % len(roles)]} for i in range(rows)]
+    path = [
+        {"path_id": i, "step_order": i % 8 + 1, "status": "In Progress", "progress": decimal.Decimal("42.50"),
+         "course_name": f"Course {i % 12}", "attempt_date": now + datetime.timedelta(minutes=i)}
+        for i in range(rows)
+    ]
+    quiz = [
+        {"question": f"Question {i}: which statement about the topic is correct?",
+         "options": [f"Option {j} with some explanatory text" for j in range(4)], "correctAnswerIndex": i % 4}
+        for i in range(5)
+    ]
+    slide = {"title": "Introduction", "image_url": "https://placehold.co/600x400", "concept": "Lorem ipsum " * 80, "example": "print('hello')\n" * 20}
+    return {
+        "/admin/employees": {"success": True, "employees": employees},
+        "learning_path": {"success": True, "path": path},
+        "quiz": quiz,
+        "slide": slide,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, default=5000)
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+
+    app = Flask(__name__)
+    # jsonify passes compact separators when not in debug mode
+    stdlib_dumps = lambda obj: DefaultJSONProvider(app).dumps(obj, separators=(',', ':')).encode()
+    orjson_dumps = lambda obj: OrjsonProvider(app).dumps(obj).encode()
+    zstd = zstandard.ZstdCompressor(level=ZSTD_LEVEL)
+
+    def sizes(body):
+        return f"{len(body):>11}{len(gzip.compress(body, compresslevel=GZIP_LEVEL)):>10}{len(zstd.compress(body)):>10}"
+
+    header = (f"{'payload':<18}{'encoder':<9}{'ms':>9}{'speedup':>9}"
+              f"{'raw B':>11}{'gzip B':>10}{'zstd B':>10}")
+    print(header)
+    print('-' * len(header))
+    for name, payload in build_payloads(args.rows).items():
+        stdlib_s = timeit.timeit(lambda: stdlib_dumps(payload), number=args.repeat) / args.repeat
+        orjson_s = timeit.timeit(lambda: orjson_dumps(payload), number=args.repeat) / args.repeat
+        print(f"{name:<18}{'stdlib':<9}{stdlib_s * 1000:>9.3f}{'':>9}{sizes(stdlib_dumps(payload))}")
+        print(f"{'':<18}{'orjson':<9}{orjson_s * 1000:>9.3f}{stdlib_s / orjson_s:>8.1f}x{sizes(orjson_dumps(payload))}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+"""
+Checks db.py's read/write routing against a real primary and replica.
+
+    DB_HOST=127.0.0.1 DB_PORT=3306 DB_REPLICA_HOSTS=127.0.0.1:3307 python check_replication.py
+
+The replica must replicate from the primary (the two servers need different
+server_id values). Covers routing to the replica, read-your-writes after a
+commit, and fallback to the primary when the replica lags too far behind or is
+down. The read-your-writes check writes to a scratch table, replication_check,
+on the primary. Exits non-zero if any check fails.
+"""
+import os
+import socket
+import sys
+import time
+import uuid
+
+from flask import Flask
+
+
+def _server_id(conn):
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT @@server_id AS server_id")
+            return cursor.fetchone()['server_id']
+    finally:
+        conn.close()
+
+
+def _unused_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def main():
+    if not os.getenv('DB_HOST') or not os.getenv('DB_REPLICA_HOSTS'):
+        print("Set DB_HOST and DB_REPLICA_HOSTS (and DB_USER/DB_PASSWORD/DB_NAME as needed) to run this check.")
+        return 2
+
+    import db
+
+    failures = []
+
+    def check(name, ok):
+        print(f"{'PASS' if ok else 'FAIL'}  {name}")
+        if not ok:
+            failures.append(name)
+
+    primary_id = _server_id(db.get_db_connection())
+    db.refresh_replica_lag()
+    print(f"primary server_id={primary_id}, replicas={db.replica_status()}")
+
+    # 1. Reads outside a write-sticky session go to a replica
+    check("read routed to replica", _server_id(db.get_read_connection()) != primary_id)
+
+    # 2. Right after a commit, the session's reads see the write (primary, or a replica
+    #    that has applied it), and go back to replicas once STICKY_SECONDS pass
+    app = Flask(__name__)
+    app.secret_key = 'check-replication'
+    token = uuid.uuid4().hex
+    with app.test_request_context():
+        conn = db.get_db_connection()
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("CREATE TABLE IF NOT EXISTS replication_check (token CHAR(32) PRIMARY KEY)")
+                cursor.execute("INSERT INTO replication_check (token) VALUES (%s)", (token,))
+            conn.commit()
+        finally:
+            conn.close()
+        conn = db.get_read_connection()
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT 1 FROM replication_check WHERE token = %s", (token,))
+                check("read after write sees the write", cursor.fetchone() is not None)
+        finally:
+            conn.close()
+        db.STICKY_SECONDS = 1.0
+        time.sleep(db.STICKY_SECONDS + 0.1)
+        check("read goes back to replica after sticky window", _server_id(db.get_read_connection()) != primary_id)
+
+    # 3. A replica over DB_MAX_REPLICA_LAG is skipped
+    max_lag = db.MAX_REPLICA_LAG
+    db.MAX_REPLICA_LAG = -1
+    check("lagging replica falls back to primary", _server_id(db.get_read_connection()) == primary_id)
+    db.MAX_REPLICA_LAG = max_lag
+
+    # 4. An unreachable replica is skipped
+    replicas = db._replicas
+    db._replicas = [('127.0.0.1', _unused_port())]
+    db.refresh_replica_lag()
+    check("unreachable replica falls back to primary", _server_id(db.get_read_connection()) == primary_id)
+    db._replicas = replicas
+
+    print(f"\n{len(failures)} check(s) failed." if failures else "\nAll checks passed.")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,61 @@
+import gzip
+import threading
+import zstandard
+from flask import request
+
+# Dynamic responses smaller than this are sent as-is; compressing them costs more than it saves.
+COMPRESS_MIN_SIZE = 1024
+COMPRESSIBLE_MIMETYPES = {
+    'application/json', 'text/html', 'text/plain', 'text/css', 'application/javascript', 'text/javascript'
+}
+GZIP_LEVEL = 6
+ZSTD_LEVEL = 3
+
+# ZstdCompressor instances are not safe to share between threads
+_local = threading.local()
+
+
+def _zstd_compress(data: bytes) -> bytes:
+    if not hasattr(_local, 'zstd'):
+        _local.zstd = zstandard.ZstdCompressor(level=ZSTD_LEVEL)
+    return _local.zstd.compress(data)
+
+
+def choose_encoding(accept_encodings):
+    """Picks the best supported Content-Encoding from the client's Accept-Encoding, preferring zstd."""
+    best, best_quality = None, 0
+    for encoding in ('zstd', 'gzip'):
+        quality = accept_encodings.quality(encoding)
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def compress_response(response):
+    """after_request hook that compresses large dynamic responses."""
+    if (response.direct_passthrough or response.is_streamed
+            or not 200 <= response.status_code < 300 or response.status_code == 204
+            or 'Content-Encoding' in response.headers
+            or response.mimetype not in COMPRESSIBLE_MIMETYPES):
+        return response
+
+    data = response.get_data()
+    if len(data) < COMPRESS_MIN_SIZE:
+        return response
+
+    response.vary.add('Accept-Encoding')
+    encoding = choose_encoding(request.accept_encodings)
+    if encoding is None:
+        return response
+
+    if encoding == 'zstd':
+        response.set_data(_zstd_compress(data))
+    else:
+        response.set_data(gzip.compress(data, compresslevel=GZIP_LEVEL))
+    response.headers['Content-Encoding'] = encoding
+    return response
+
+
+def init_compression(app):
+    """Registers response compression on the Flask app."""
+    app.after_request(compress_response)
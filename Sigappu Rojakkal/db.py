@@ -1,15 +1,212 @@
 import pymysql
 import os
+import time
+import itertools
+import threading
+from flask import has_request_context, session
 
-def get_db_connection():
+# --- Read/Write Routing ---
+# Writes always go to the primary (DB_HOST). Read-only routes can call
+# get_read_connection(), which picks a replica from DB_REPLICA_HOSTS
+# ("host[:port],host[:port]"). Two local MySQL instances work for testing,
+# e.g. DB_HOST=127.0.0.1 DB_PORT=3306 DB_REPLICA_HOSTS=127.0.0.1:3307,
+# provided the second one replicates from the first. The replica user
+# (DB_REPLICA_USER, defaulting to DB_USER) needs REPLICATION CLIENT to read lag.
+
+# Replicas lagging more than this (or not replicating at all) are skipped.
+MAX_REPLICA_LAG = float(os.getenv('DB_MAX_REPLICA_LAG', '5'))
+# How often a background thread re-checks each replica's lag.
+LAG_CHECK_INTERVAL = float(os.getenv('DB_LAG_CHECK_INTERVAL', '10'))
+# After a session commits, its reads only go to replicas that have applied the
+# commit's GTIDs (or, without GTID replication, stay on the primary) for this
+# many seconds. A replica can be up to MAX_REPLICA_LAG behind as of a sample
+# that is up to LAG_CHECK_INTERVAL old, so a shorter window could let a session
+# miss its own write.
+STICKY_SECONDS = float(os.getenv('DB_STICKY_SECONDS', MAX_REPLICA_LAG + LAG_CHECK_INTERVAL))
+if STICKY_SECONDS < MAX_REPLICA_LAG + LAG_CHECK_INTERVAL:
+    raise RuntimeError(
+        f"DB_STICKY_SECONDS ({STICKY_SECONDS:g}) must be at least "
+        f"DB_MAX_REPLICA_LAG + DB_LAG_CHECK_INTERVAL ({MAX_REPLICA_LAG + LAG_CHECK_INTERVAL:g})"
+    )
+
+_SESSION_WRITE_KEY = 'db_last_write'
+_SESSION_GTID_KEY = 'db_write_gtids'
+
+
+def _parse_hosts(value: str):
+    hosts = []
+    for entry in filter(None, (part.strip() for part in value.split(','))):
+        host, _, port = entry.partition(':')
+        hosts.append((host, int(port) if port else 3306))
+    return hosts
+
+_replicas = _parse_hosts(os.getenv('DB_REPLICA_HOSTS', ''))
+_replica_counter = itertools.count()
+_lag_lock = threading.Lock()
+_replica_lag = {}  # (host, port) -> (checked_at, lag_seconds or None)
+_lag_thread = None
+
+
+def _connection_kwargs(host, port, user_var='DB_USER', password_var='DB_PASSWORD'):
+    return dict(
+        host=host,
+        port=port,
+        user=os.getenv(user_var, os.getenv('DB_USER', 'root')),
+        password=os.getenv(password_var, os.getenv('DB_PASSWORD', '1234')),
+        database=os.getenv('DB_NAME', 'learning_path_db'), # Corrected database name
+        cursorclass=pymysql.cursors.DictCursor
+    )
+
+
+class _PrimaryConnection(pymysql.connections.Connection):
+    """Primary connection that records the time and GTID set of each commit in the user's session."""
+
+    def commit(self):
+        super().commit()
+        if has_request_context():
+            session[_SESSION_WRITE_KEY] = time.time()
+            session[_SESSION_GTID_KEY] = self._executed_gtids()
+
+    def _executed_gtids(self):
+        # Empty (or unreadable) when GTID replication is off; reads then stay on the primary
+        try:
+            with self.cursor() as cursor:
+                cursor.execute("SELECT @@GLOBAL.gtid_executed AS gtids")
+                return cursor.fetchone()['gtids'] or None
+        except pymysql.err.MySQLError:
+            return None
+
+
+def get_db_connection(track_writes: bool = True):
     """
-    Establishes a connection to the MySQL database.
+    Establishes a connection to the primary MySQL database.
     UPDATED to connect to the 'learning_path_db'.
+    Commits on it pin the session's reads to the primary (read-your-writes);
+    pass track_writes=False for internal writes such as caches that users never read back.
     """
+    connection_class = _PrimaryConnection if track_writes else pymysql.connections.Connection
+    return connection_class(**_connection_kwargs(
+        os.getenv('DB_HOST', 'localhost'), int(os.getenv('DB_PORT', '3306'))
+    ))
+
+
+def _session_recently_wrote():
+    if not has_request_context():
+        return False
+    last_write = session.get(_SESSION_WRITE_KEY)
+    return last_write is not None and time.time() - last_write < STICKY_SECONDS
+
+
+def _replica_has_applied(conn, gtids):
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT GTID_SUBSET(%s, @@GLOBAL.gtid_executed) AS applied", (gtids,))
+            return bool(cursor.fetchone()['applied'])
+    except pymysql.err.MySQLError:
+        return False
+
+
+def _connect_replica(replica):
     return pymysql.connect(
-        host=os.getenv('DB_HOST', 'localhost'),
-        user=os.getenv('DB_USER', 'root'),
-        password=os.getenv('DB_PASSWORD', '1234'),
-        database=os.getenv('DB_NAME', 'learning_path_db'), # Corrected database name
-        cursorclass=pymysql.cursors.DictCursor
+        init_command="SET SESSION TRANSACTION READ ONLY",
+        connect_timeout=2,
+        **_connection_kwargs(*replica, user_var='DB_REPLICA_USER', password_var='DB_REPLICA_PASSWORD')
     )
+
+
+def _measure_lag(replica):
+    """Returns the replica's lag in seconds, or None if it is unreachable or not replicating."""
+    try:
+        conn = _connect_replica(replica)
+    except pymysql.err.MySQLError:
+        return None
+    try:
+        with conn.cursor() as cursor:
+            try:
+                cursor.execute("SHOW REPLICA STATUS")
+            except pymysql.err.MySQLError:
+                # MySQL < 8.0.22
+                cursor.execute("SHOW SLAVE STATUS")
+            status = cursor.fetchone()
+        if not status:
+            return None
+        lag = status.get('Seconds_Behind_Source', status.get('Seconds_Behind_Master'))
+        return float(lag) if lag is not None else None
+    except pymysql.err.MySQLError:
+        return None
+    finally:
+        conn.close()
+
+
+def refresh_replica_lag():
+    """Measures every replica's lag now and stores the results used for routing."""
+    for replica in _replicas:
+        lag = _measure_lag(replica)
+        with _lag_lock:
+            _replica_lag[replica] = (time.time(), lag)
+
+
+def _lag_monitor():
+    while True:
+        refresh_replica_lag()
+        time.sleep(LAG_CHECK_INTERVAL)
+
+
+def _ensure_lag_monitor():
+    # Probing happens on a daemon thread, so an unreachable replica never delays a request.
+    # It is started lazily so that each (possibly forked) worker process runs its own.
+    global _lag_thread
+    with _lag_lock:
+        if _lag_thread is None or not _lag_thread.is_alive():
+            _lag_thread = threading.Thread(target=_lag_monitor, name='replica-lag-monitor', daemon=True)
+            _lag_thread.start()
+
+
+def _replica_usable(replica):
+    # Replicas not measured yet are treated as unusable until the first probe completes
+    with _lag_lock:
+        _, lag = _replica_lag.get(replica, (0, None))
+    return lag is not None and lag <= MAX_REPLICA_LAG
+
+
+def get_read_connection():
+    """
+    Returns a connection for read-only queries.
+    Uses a replica in round-robin order, falling back to the primary when no
+    replicas are configured or all of them lag too far behind. If the current
+    session committed a write within the last STICKY_SECONDS, only a replica
+    that has already applied that write's GTIDs is used.
+    """
+    if not _replicas:
+        return get_db_connection()
+    required_gtids = None
+    if _session_recently_wrote():
+        required_gtids = session.get(_SESSION_GTID_KEY)
+        if not required_gtids:
+            return get_db_connection()
+    _ensure_lag_monitor()
+    start = next(_replica_counter)
+    for i in range(len(_replicas)):
+        replica = _replicas[(start + i) % len(_replicas)]
+        if not _replica_usable(replica):
+            continue
+        try:
+            conn = _connect_replica(replica)
+        except pymysql.err.MySQLError:
+            with _lag_lock:
+                _replica_lag[replica] = (time.time(), None)
+            continue
+        if required_gtids is None or _replica_has_applied(conn, required_gtids):
+            return conn
+        conn.close()
+    return get_db_connection()
+
+
+def replica_status():
+    """Returns the last measured lag of each configured replica, for monitoring."""
+    with _lag_lock:
+        return [
+            {"host": f"{host}:{port}", "lag_seconds": lag, "checked_at": checked_at,
+             "usable": lag is not None and lag <= MAX_REPLICA_LAG}
+            for (host, port), (checked_at, lag) in ((r, _replica_lag.get(r, (0, None))) for r in _replicas)
+        ]
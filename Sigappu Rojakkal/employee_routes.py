@@ -1,8 +1,11 @@
 from flask import Blueprint, jsonify, request, session, render_template, redirect
-from db import get_db_connection
+from db import get_db_connection, get_read_connection
 # CORRECTED: Import the new tracker_agent_analysis function
-from ai_agents import recommender_agent_create_path, course_content_agent, assessment_question_agent, tracker_agent_analysis
+from ai_agents import (recommender_agent_create_path, course_content_agent, assessment_question_agent, tracker_agent_analysis,
+                       acourse_content_agent, aassessment_question_agent, atracker_agent_analysis)
+from async_views import async_variant
 import json
+import asyncio
 
 employee_bp = Blueprint('employee', __name__)
 
@@ -66,7 +69,7 @@ def learning_path():
     emp_id = session.get('emp_code')
     if request.method == 'POST':
         return jsonify(recommender_agent_create_path(emp_id))
-    conn = get_db_connection()
+    conn = get_read_connection()
     try:
         with conn.cursor() as cursor:
             sql = "SELECT lp.path_id, lp.step_order, lp.status, lp.progress, c.course_name FROM learning_path lp JOIN courses c ON lp.course_id = c.course_id WHERE lp.emp_id = %s ORDER BY lp.step_order"
@@ -83,21 +86,33 @@ def course_player_page(path_id):
     # The total slides is hardcoded for this demonstration
     return render_template('course_player.html', path_id=path_id, total_slides=10)
 
-@employee_bp.route('/get_slide_content', methods=['POST'])
-def get_slide_content():
-    if session.get('role') != 'employee': return jsonify({"error": "Unauthorized"}), 401
-    data = request.json
-    path_id, slide_number, total_slides = data.get('path_id'), data.get('slide_number'), data.get('total_slides', 10)
+def _fetch_path_course(path_id, emp_id):
     conn = get_db_connection()
     try:
         with conn.cursor() as cursor:
-            cursor.execute("SELECT c.course_name FROM learning_path lp JOIN courses c ON lp.course_id = c.course_id WHERE lp.path_id = %s AND lp.emp_id = %s", (path_id, session.get('emp_code')))
-            course = cursor.fetchone()
-            if not course: return jsonify({"error": "Course not found"}), 404
-        return jsonify(course_content_agent(course['course_name'], slide_number, total_slides))
+            cursor.execute("SELECT c.course_name FROM learning_path lp JOIN courses c ON lp.course_id = c.course_id WHERE lp.path_id = %s AND lp.emp_id = %s", (path_id, emp_id))
+            return cursor.fetchone()
     finally:
         conn.close()
 
+@employee_bp.route('/get_slide_content', methods=['POST'])
+def get_slide_content():
+    if session.get('role') != 'employee': return jsonify({"error": "Unauthorized"}), 401
+    data = request.json
+    path_id, slide_number, total_slides = data.get('path_id'), data.get('slide_number'), data.get('total_slides', 10)
+    course = _fetch_path_course(path_id, session.get('emp_code'))
+    if not course: return jsonify({"error": "Course not found"}), 404
+    return jsonify(course_content_agent(course['course_name'], slide_number, total_slides))
+
+@async_variant(get_slide_content)
+async def get_slide_content_async():
+    if session.get('role') != 'employee': return jsonify({"error": "Unauthorized"}), 401
+    data = request.json
+    path_id, slide_number, total_slides = data.get('path_id'), data.get('slide_number'), data.get('total_slides', 10)
+    course = await asyncio.to_thread(_fetch_path_course, path_id, session.get('emp_code'))
+    if not course: return jsonify({"error": "Course not found"}), 404
+    return jsonify(await acourse_content_agent(course['course_name'], slide_number, total_slides))
+
 @employee_bp.route('/update_progress', methods=['POST'])
 def update_progress():
     if session.get('role') != 'employee': return jsonify({"success": False, "message": "Unauthorized"}), 401
@@ -123,7 +138,7 @@ def assessment_page():
 @employee_bp.route('/get_pending_assessments', methods=['GET'])
 def get_pending_assessments():
     if session.get('role') != 'employee': return jsonify({"success": False, "message": "Unauthorized"}), 401
-    conn = get_db_connection()
+    conn = get_read_connection()
     try:
         with conn.cursor() as cursor:
             sql = "SELECT lp.path_id, c.course_name FROM learning_path lp JOIN courses c ON lp.course_id = c.course_id WHERE lp.emp_id = %s AND lp.status IN ('Completed', 'Failed') ORDER BY lp.step_order"
@@ -141,6 +156,14 @@ def get_assessment_questions():
     questions = assessment_question_agent(course_name)
     return jsonify(questions)
 
+@async_variant(get_assessment_questions)
+async def get_assessment_questions_async():
+    if session.get('role') != 'employee': return jsonify({"error": "Unauthorized"}), 401
+    course_name = request.json.get('course_name')
+    if not course_name: return jsonify({"error": "Course name is required"}), 400
+    questions = await aassessment_question_agent(course_name)
+    return jsonify(questions)
+
 @employee_bp.route('/submit_assessment', methods=['POST'])
 def submit_assessment():
     if session.get('role') != 'employee': return jsonify({"success": False, "message": "Unauthorized"}), 401
@@ -180,4 +203,13 @@ def get_tracker_analysis():
         return jsonify({"error": "Unauthorized"}), 401
     emp_id = session.get('emp_code')
     analysis = tracker_agent_analysis(emp_id)
+    return jsonify(analysis)
+
+@async_variant(get_tracker_analysis)
+async def get_tracker_analysis_async():
+    """Async variant of get_tracker_analysis, used when served through asgi.py."""
+    if session.get('role') != 'employee':
+        return jsonify({"error": "Unauthorized"}), 401
+    emp_id = session.get('emp_code')
+    analysis = await atracker_agent_analysis(emp_id)
     return jsonify(analysis)
\ No newline at end of file
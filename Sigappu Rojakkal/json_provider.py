@@ -0,0 +1,47 @@
+import datetime
+import decimal
+import orjson
+from flask.json.provider import JSONProvider
+
+
+def _default(obj):
+    """Encodes the values orjson does not handle natively, matching Flask's default provider."""
+    if isinstance(obj, decimal.Decimal):
+        # DECIMAL columns from pymysql; Flask's default provider also emits them as strings
+        return str(obj)
+    if isinstance(obj, datetime.timedelta):
+        # MySQL TIME columns come back as timedelta
+        return str(obj)
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    if isinstance(obj, (bytes, bytearray)):
+        return obj.decode('utf-8', 'replace')
+    if hasattr(obj, '__html__'):
+        return str(obj.__html__())
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+class OrjsonProvider(JSONProvider):
+    """
+    JSON provider backed by orjson. datetime, date, UUID and dataclass values
+    from DictCursor rows are serialized natively (datetimes as ISO 8601).
+    """
+
+    option = orjson.OPT_NON_STR_KEYS
+
+    def dumps(self, obj, **kwargs):
+        option = self.option | (orjson.OPT_SORT_KEYS if kwargs.get('sort_keys') else 0)
+        return orjson.dumps(obj, default=_default, option=option).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        option = self.option
+        if self._app.debug:
+            option |= orjson.OPT_INDENT_2
+        return self._app.response_class(
+            orjson.dumps(obj, default=_default, option=option) + b"\n",
+            mimetype='application/json'
+        )
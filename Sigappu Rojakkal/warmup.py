@@ -0,0 +1,167 @@
+import os
+import json
+import time
+import uuid
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+
+from db import get_read_connection
+from ai_agents import warm_artifact
+
+ARTIFACT_KINDS = ('slides', 'quizzes', 'reports', 'trackers')
+
+
+class _RateLimiter:
+    """Spaces LLM calls evenly so all workers together stay under calls_per_minute."""
+
+    def __init__(self, calls_per_minute: float):
+        self.interval = 60.0 / calls_per_minute if calls_per_minute > 0 else 0
+        self.next_slot = time.monotonic()
+        self.lock = threading.Lock()
+
+    def wait(self):
+        with self.lock:
+            now = time.monotonic()
+            slot = max(self.next_slot, now)
+            self.next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+def _enumerate_tasks(kinds, total_slides, quiz_pool):
+    """Builds the (task_id, kind, target) list from the courses and employees tables."""
+    conn = get_read_connection()
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT course_name FROM courses ORDER BY course_id")
+            courses = [row['course_name'] for row in cursor.fetchall()]
+            cursor.execute("SELECT id FROM employees ORDER BY id")
+            employees = [row['id'] for row in cursor.fetchall()]
+    finally:
+        conn.close()
+
+    tasks = []
+    if 'slides' in kinds:
+        for course in courses:
+            for n in range(1, total_slides + 1):
+                tasks.append((f"slide:{course}:{n}/{total_slides}", 'slide', (course, n, total_slides)))
+    if 'quizzes' in kinds:
+        # One task per course, so only one worker ever tops up a given pool
+        tasks.extend((f"quiz:{course}", 'quiz', (course, quiz_pool)) for course in courses)
+    if 'reports' in kinds:
+        tasks.extend((f"report:{emp_id}", 'report', emp_id) for emp_id in employees)
+    if 'trackers' in kinds:
+        tasks.extend((f"tracker:{emp_id}", 'tracker', emp_id) for emp_id in employees)
+    return tasks
+
+
+def _load_checkpoint(path, max_age):
+    """
+    Returns the interrupted run recorded in path as a dict (run_id, started_at, done),
+    or None if there is none or it started more than max_age seconds ago.
+    """
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        run = json.load(f)
+    if 'run_id' not in run or time.time() - run.get('started_at', 0) > max_age:
+        return None
+    run['done'] = set(run.get('done', []))
+    return run
+
+
+def _save_checkpoint(path, run):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump({**run, 'done': sorted(run['done'])}, f)
+    os.replace(tmp_path, path)
+
+
+def _format_eta(seconds):
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours:d}h{minutes:02d}m{seconds:02d}s"
+
+
+@click.command('warmup')
+@click.option('--only', 'kinds', multiple=True, type=click.Choice(ARTIFACT_KINDS), help='Artifact kinds to precompute (default: all).')
+@click.option('--workers', default=4, show_default=True, help='Number of concurrent workers.')
+@click.option('--rate', default=60.0, show_default=True, help='Maximum LLM calls per minute across all workers.')
+@click.option('--slides', 'total_slides', default=10, show_default=True, help='Slides per course, matching the course player.')
+@click.option('--quiz-pool', default=5, show_default=True, help='Unserved quizzes to keep pooled per course; each is served once.')
+@click.option('--checkpoint', default=None, help='Checkpoint file (default: instance/warmup_checkpoint.json).')
+@click.option('--restart', is_flag=True, help='Ignore an existing checkpoint and start from the beginning.')
+@click.option('--resume-within', default=12.0, show_default=True, help='Hours after its start during which an unfinished run is resumed; older checkpoints are discarded.')
+@click.option('--report-every', default=10.0, show_default=True, help='Seconds between progress reports.')
+@with_appcontext
+def warmup_command(kinds, workers, rate, total_slides, quiz_pool, checkpoint, restart, resume_within, report_every):
+    """
+    Precomputes slides, quiz pools, admin reports and tracker summaries ahead of peak hours.
+    Artifacts whose inputs have not changed are skipped, and progress is checkpointed
+    so an interrupted run resumes where it stopped. A checkpoint only covers one run:
+    once it is older than --resume-within, every task is checked against the cache again.
+    """
+    kinds = kinds or ARTIFACT_KINDS
+    checkpoint = checkpoint or os.path.join(current_app.instance_path, 'warmup_checkpoint.json')
+    run = None if restart else _load_checkpoint(checkpoint, resume_within * 3600)
+    if run is None:
+        run = {'run_id': uuid.uuid4().hex, 'started_at': time.time(), 'done': set()}
+    else:
+        click.echo(f"Resuming run {run['run_id']} started {time.ctime(run['started_at'])}.")
+    done = run['done']
+
+    tasks = [task for task in _enumerate_tasks(kinds, total_slides, quiz_pool) if task[0] not in done]
+    click.echo(f"Warmup: {len(tasks)} tasks to run ({len(done)} already done in this run), {workers} workers, {rate:g} calls/min.")
+
+    limiter = _RateLimiter(rate)
+    counts = {'generated': 0, 'skipped': 0, 'failed': 0}
+    started = last_report = time.monotonic()
+
+    def report():
+        elapsed = time.monotonic() - started
+        finished = sum(counts.values())
+        throughput = finished / elapsed * 60 if elapsed else 0
+        eta = (len(tasks) - finished) / (finished / elapsed) if finished else 0
+        click.echo(
+            f"  {finished}/{len(tasks)} | generated {counts['generated']}, skipped {counts['skipped']}, "
+            f"failed {counts['failed']} | {throughput:.1f} tasks/min | ETA {_format_eta(eta)}"
+        )
+
+    executor = ThreadPoolExecutor(max_workers=workers)
+    futures = {executor.submit(warm_artifact, kind, target, limiter.wait): task_id for task_id, kind, target in tasks}
+    try:
+        for future in as_completed(futures):
+            task_id = futures[future]
+            try:
+                counts[future.result()] += 1
+                done.add(task_id)
+            except Exception as e:
+                counts['failed'] += 1
+                click.echo(f"  FAILED {task_id}: {e}", err=True)
+            if time.monotonic() - last_report >= report_every:
+                last_report = time.monotonic()
+                _save_checkpoint(checkpoint, run)
+                report()
+    except KeyboardInterrupt:
+        executor.shutdown(wait=False, cancel_futures=True)
+        _save_checkpoint(checkpoint, run)
+        report()
+        click.echo(f"Interrupted. Progress saved to {checkpoint}; re-run the command to resume.")
+        raise SystemExit(1)
+    executor.shutdown()
+
+    report()
+    if counts['failed']:
+        # Keep the checkpoint so a re-run within --resume-within only retries the failures
+        _save_checkpoint(checkpoint, run)
+        click.echo(f"Finished with {counts['failed']} failures. Re-run within {resume_within:g}h to retry only them (checkpoint: {checkpoint}).")
+    else:
+        # A complete run starts fresh next time; unchanged inputs are still skipped via the cache
+        if os.path.exists(checkpoint):
+            os.remove(checkpoint)
+        click.echo("Warmup complete.")